@@ -1,26 +1,61 @@
+import os
+# SDL/pygame settings must be in the environment before pygame is imported; all can be overridden from outside.
+# Use SDL2's own (SIMD) blitters instead of pygame's fallback path
+os.environ.setdefault("PYGAME_BLEND_ALPHA_SDL2", "1")
+# Drive the display through KMS/DRM with the GLES2 renderer (GPU flips, no X11/llvmpipe in the way) when
+# started from a console. Under a desktop session (X11/Wayland holds DRM master) SDL picks its own driver.
+# If KMS/DRM can't be initialised or no display mode opens on it, SDL's default driver is used instead.
+_VIDEO_DRIVER_DEFAULTED = ("SDL_VIDEODRIVER" not in os.environ
+                           and not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"))
+if _VIDEO_DRIVER_DEFAULTED:
+    os.environ["SDL_VIDEODRIVER"] = "kmsdrm"
+os.environ.setdefault("SDL_RENDER_DRIVER", "opengles2")
+os.environ.setdefault("SDL_VIDEO_X11_FORCE_EGL", "1") # GLES via EGL when falling back to X11
 import pygame
 import sys
-import os
 import cv2
+import numpy as np
 import RPi.GPIO as GPIO
 import time
 import traceback
+import re
+import struct
+import queue
+import threading
+import hashlib
+import shutil
+import subprocess
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 # --- Modbus Imports ---
 from pymodbus.client.sync import ModbusSerialClient as ModbusClient
-from pymodbus.constants import Endian
-from pymodbus.payload import BinaryPayloadDecoder
 from pymodbus.exceptions import ConnectionException
 # --- End Modbus Imports ---
 
 # --- Constants ---
 MEDIA_FOLDER = "/home/pi/media"
+MEDIA_CACHE_FOLDER = os.path.join(MEDIA_FOLDER, "cache") # Screen-sized copies of media (built on first run)
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov")
+# Logical render size for the SCALED display mode, e.g. (1280, 720) to match 720p videos: everything is drawn
+# at this size and SDL's GPU renderer upscales to the panel, so frames of that size need no CPU resize.
+# None renders at the panel's native resolution (sharpest text).
+RENDER_RESOLUTION = None
 BUTTON_PINS = [4, 17, 27, 23, 24]  # GPIO BCM Pins
 MODBUS_PORT = "/dev/ttyUSB0"
 MODBUS_BAUDRATE = 9600
 MODBUS_UNIT_ID = 0x1
-MODBUS_TIMEOUT = 0.5  # Shorter timeout for faster failure detection
 MODBUS_READ_INTERVAL = 0.8 # Seconds between sensor reads (adjust if needed)
+MODBUS_VOLTAGE_ADDRESS = 142 # Holding registers (2 x 16-bit each, 32-bit float)
+MODBUS_CURRENT_ADDRESS = 150
+MODBUS_BATCH_READ = True # Read voltage..current in one transaction; set False if the meter rejects the gap registers
+MODBUS_SLAVE_LATENCY = 0.1 # Seconds for meter turnaround plus USB-serial latency (FTDI adds ~16 ms); lower only after measuring
+# The read timer starts when the request is handed to the driver, so the timeout covers the 8-byte request
+# and the longest expected response on the wire (11 bit-times per char, 5 framing bytes + 2 per register)
+_MODBUS_MAX_REGISTERS = MODBUS_CURRENT_ADDRESS - MODBUS_VOLTAGE_ADDRESS + 2 if MODBUS_BATCH_READ else 2
+MODBUS_TIMEOUT = max(0.05, 11 * (8 + 5 + 2 * _MODBUS_MAX_REGISTERS) / MODBUS_BAUDRATE + MODBUS_SLAVE_LATENCY)
+MODBUS_STALE_AFTER = 5.0 # Seconds the last good reading is kept on screen while reads fail
 
 # Media files indices mapping to buttons (adjust if file order changes)
 BUTTON_MEDIA_MAP = {
@@ -31,15 +66,20 @@ BUTTON_MEDIA_MAP = {
 }
 BUTTON_VOLTAGE_DISPLAY = 27 # Button dedicated to voltage display
 
+IMAGE_PRELOAD_WORKERS = 4 # Threads decoding/scaling images at boot (Pi 3/4 have 4 cores)
+
 STARTUP_MEDIA_COUNT = 4
 STARTUP_TIMEOUT = 15 # Shorter startup timeout per media
 
 # Timing and Debounce
-DEBOUNCE_TIME = 0.15  # Shorter debounce for quicker response (adjust if bounce occurs)
-MAIN_LOOP_WAIT_MS = 30 # Small wait in main loop (milliseconds)
-SENSOR_DISPLAY_WAIT_MS = 50 # Wait in sensor display loop
-VIDEO_FRAME_WAIT_SAFETY_MARGIN_MS = 5 # Added to frame time for stability
-MEDIA_WAIT_MS = 50 # Wait while showing static image
+DEBOUNCE_TIME = 0.15  # Edge-detect bouncetime in seconds (adjust if bounce occurs)
+MAX_INPUT_WAIT_MS = 1000 # Longest single block in pygame.event.wait, so Ctrl+C is still noticed on idle screens
+SENSOR_DISPLAY_FPS = 20 # Sensor screen redraw/input rate (readings still follow MODBUS_READ_INTERVAL)
+USE_GSTREAMER_HW_DECODE = True # Decode H.264 .mp4/.mov on the Pi's V4L2 hardware decoder when OpenCV has GStreamer
+CACHE_VIDEO_CAPTURES = True # Keep each video opened between playbacks (skips demux/codec setup on a button press); set False if RAM is tight
+VIDEO_QUEUE_SIZE = 2 # Decoded frames buffered ahead of the display
+VIDEO_POLL_INTERVAL = 0.05 # Max seconds to block waiting for a frame before re-checking input
+VIDEO_DECODER_JOIN_TIMEOUT = 2.0 # Seconds to wait for the decoder thread to stop before abandoning it (stalled grab/retrieve)
 
 # Display Colors
 COLOR_BLACK = (0, 0, 0)
@@ -52,32 +92,78 @@ CURRENT_BLINK_THRESHOLD = 10.0 # Amps
 
 # --- Pygame Initialization ---
 pygame.init()
-pygame.mouse.set_visible(False)
+if not pygame.display.get_init() and _VIDEO_DRIVER_DEFAULTED:
+    print("KMS/DRM video driver unavailable, using SDL's default driver.")
+    del os.environ["SDL_VIDEODRIVER"]
+    pygame.display.init()
+BUTTON_EVENT = pygame.event.custom_type() # Posted by the GPIO callback for each button press (event.pin)
 
 # Screen setup
-info = pygame.display.Info()
-screen_width, screen_height = info.current_w, info.current_h
-try:
-    # Explicitly request hardware acceleration if available, along with double buffering
-    screen = pygame.display.set_mode((screen_width, screen_height), pygame.FULLSCREEN | pygame.DOUBLEBUF | pygame.HWSURFACE)
-    print("Using FULLSCREEN, DOUBLEBUF, HWSURFACE")
-except pygame.error as e:
-    print(f"Hardware surface error: {e}. Falling back.")
-    try:
-        screen = pygame.display.set_mode((screen_width, screen_height), pygame.FULLSCREEN | pygame.DOUBLEBUF)
-        print("Using FULLSCREEN, DOUBLEBUF")
-    except pygame.error as e2:
-        print(f"Double buffer error: {e2}. Using FULLSCREEN only.")
-        screen = pygame.display.set_mode((screen_width, screen_height), pygame.FULLSCREEN)
+# pygame's SCALED mode only stretches to the full panel (instead of integer scaling, which would draw
+# e.g. 1280x720 at 1x letterboxed on a 1080p panel) when the render scale quality hint is non-zero.
+# SDL reads the hint from the environment when the renderer is created, so it can still be set here.
+os.environ.setdefault("SDL_RENDER_SCALE_QUALITY", "1" if RENDER_RESOLUTION else "0") # Linear upscale; nearest at native size
+# Most accelerated mode first: SCALED goes through SDL2's GPU renderer, with vsynced flips.
+# Under SCALED every display.update(rects) re-presents the whole frame, so the sensor screen's
+# dirty-rect updates only save bandwidth on the non-SCALED fallbacks (idle frames still skip presenting).
+DISPLAY_MODES = [
+    ("FULLSCREEN, SCALED, DOUBLEBUF, vsync", pygame.FULLSCREEN | pygame.SCALED | pygame.DOUBLEBUF, 1),
+    ("FULLSCREEN, DOUBLEBUF, HWSURFACE", pygame.FULLSCREEN | pygame.DOUBLEBUF | pygame.HWSURFACE, 0),
+    ("FULLSCREEN, DOUBLEBUF", pygame.FULLSCREEN | pygame.DOUBLEBUF, 0),
+    ("FULLSCREEN", pygame.FULLSCREEN, 0),
+]
+
+def _open_display():
+    """Tries DISPLAY_MODES in order on the current video driver. Returns the screen surface, or None if none opens."""
+    info = pygame.display.Info()
+    native_size = (info.current_w, info.current_h)
+    for mode_name, mode_flags, mode_vsync in DISPLAY_MODES:
+        # Only SCALED can render below the panel resolution (the renderer does the upscale)
+        mode_size = RENDER_RESOLUTION if RENDER_RESOLUTION and mode_flags & pygame.SCALED else native_size
+        try:
+            display = pygame.display.set_mode(mode_size, mode_flags, vsync=mode_vsync)
+            print(f"Using {mode_name} at {mode_size[0]}x{mode_size[1]}")
+            return display
+        except pygame.error as e:
+            print(f"Display mode {mode_name} failed: {e}. Falling back.")
+    return None
+
+screen = _open_display()
+if screen is None and _VIDEO_DRIVER_DEFAULTED and os.environ.get("SDL_VIDEODRIVER") == "kmsdrm":
+    # KMS/DRM initialised but can't present (e.g. another process holds DRM master): retry on SDL's default driver
+    print("No display mode opened on KMS/DRM, retrying with SDL's default driver.")
+    pygame.display.quit()
+    del os.environ["SDL_VIDEODRIVER"]
+    pygame.display.init()
+    screen = _open_display()
+if screen is None:
+    raise RuntimeError("No usable fullscreen display mode.")
+screen_width, screen_height = screen.get_size() # Logical size: all layout, caches and video scaling use this
 pygame.display.set_caption("Hand Tool Monitor")
+pygame.mouse.set_visible(False)
+# Only QUIT, KEYDOWN and button presses are ever handled: keep every other event type (mouse motion, window, text...) out of the queue
+pygame.event.set_blocked(None)
+pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, BUTTON_EVENT])
 
 
 # --- GPIO Setup ---
 GPIO.setwarnings(False)
 GPIO.cleanup()
 GPIO.setmode(GPIO.BCM)
+# Button presses are delivered by RPi.GPIO's edge-detect thread into the pygame event queue,
+# so display loops block in one place for both keys and buttons, and never poll pins or sleep to debounce.
+
+def _on_button_edge(pin):
+    """GPIO edge callback (runs on the RPi.GPIO thread). Posts the pressed pin as a BUTTON_EVENT."""
+    try:
+        pygame.event.post(pygame.event.Event(BUTTON_EVENT, pin=pin))
+    except pygame.error:
+        pass # Display already shut down
+
 for pin in BUTTON_PINS:
     GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
+    GPIO.add_event_detect(pin, GPIO.RISING, callback=_on_button_edge,
+                          bouncetime=int(DEBOUNCE_TIME * 1000))
 print("GPIO setup complete.")
 
 # --- Modbus Client Setup ---
@@ -88,26 +174,129 @@ modbus_connected = False # Track connection status
 
 
 # --- Media Loading ---
-media_files = []
+media_files = [] # Images and videos together, sorted (BUTTON_MEDIA_MAP indexes this)
+media_paths = () # Full path of each entry in media_files, joined once after listing
+media_kind = {} # filename -> "image" or "video", classified once while scanning
+image_files = []
+video_files = []
 preloaded_images = {}
+video_paths = {} # filename -> path actually played (screen-sized cache copy or original)
+
+def _media_cache_path(filename, ext):
+    """Cache path for a screen-sized copy of a media file: "<source name hash>-<screen size/mtime hash><ext>",
+    so every variant of one source shares a prefix (see _prune_media_cache)."""
+    src_path = os.path.join(MEDIA_FOLDER, filename)
+    name_hash = hashlib.sha1(filename.encode()).hexdigest()[:16]
+    variant = f"{screen_width}x{screen_height}|{os.path.getmtime(src_path)}"
+    return os.path.join(MEDIA_CACHE_FOLDER, f"{name_hash}-{hashlib.sha1(variant.encode()).hexdigest()[:16]}{ext}")
+
+def _prune_media_cache(cache_path):
+    """Deletes older cache entries for the same source (other screen size or mtime) before `cache_path` is
+    written, so editing media or changing the screen doesn't keep growing the cache on the SD card."""
+    cache_dir, cache_name = os.path.split(cache_path)
+    prefix = cache_name.split("-", 1)[0] + "-"
+    ext = os.path.splitext(cache_name)[1]
+    try:
+        with os.scandir(cache_dir) as entries:
+            for entry in entries:
+                if entry.name != cache_name and entry.name.startswith(prefix) and entry.name.endswith((ext, ext + ".tmp")):
+                    os.remove(entry.path)
+    except OSError as e:
+        print(f"Warning: Could not prune media cache for {cache_name}: {e}")
+
+def load_screen_image(filename):
+    """Loads an image at screen size, from the raw-pixel cache if present, otherwise decoding, scaling and caching it.
+    Safe to call from worker threads; the returned surface is not yet converted to the display format."""
+    size = (screen_width, screen_height)
+    cache_path = _media_cache_path(filename, ".raw")
+    if os.path.isfile(cache_path):
+        with open(cache_path, "rb") as fp:
+            pixels = fp.read()
+        if len(pixels) == screen_width * screen_height * 3:
+            return pygame.image.frombuffer(pixels, size, "RGB") # No decode, no scale
+        print(f"Warning: Ignoring truncated image cache for {filename}")
+    image = pygame.image.load(os.path.join(MEDIA_FOLDER, filename))
+    image = pygame.transform.scale(image, size)
+    try:
+        os.makedirs(MEDIA_CACHE_FOLDER, exist_ok=True)
+        _prune_media_cache(cache_path)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "wb") as fp:
+            fp.write(pygame.image.tobytes(image, "RGB"))
+        os.replace(tmp_path, cache_path) # Never leave a half-written cache file behind
+    except Exception as e:
+        print(f"Warning: Could not cache scaled image {filename}: {e}")
+    return image
+
+GSTREAMER_AVAILABLE = re.search(r"GStreamer:\s*YES", cv2.getBuildInformation()) is not None
+HW_DECODE_EXTENSIONS = (".mp4", ".mov") # Containers qtdemux can read
+
+def uses_hw_decode(video_path):
+    """True if `video_path` is played through the GStreamer hardware-decode pipeline (see open_video_capture)."""
+    return USE_GSTREAMER_HW_DECODE and GSTREAMER_AVAILABLE and video_path.lower().endswith(HW_DECODE_EXTENSIONS)
+
+def get_screen_video(filename):
+    """Returns the path of a screen-sized MJPEG copy of a video, transcoding it with ffmpeg on first run.
+    Falls back to the original file if ffmpeg is unavailable or fails. Files the hardware decoder
+    will play are never transcoded: the pipeline already scales them, and MJPEG would bypass it."""
+    src_path = os.path.join(MEDIA_FOLDER, filename)
+    if uses_hw_decode(src_path):
+        return src_path
+    cache_path = _media_cache_path(filename, ".avi")
+    if os.path.isfile(cache_path):
+        return cache_path
+    if shutil.which("ffmpeg") is None:
+        return src_path
+    print(f"Transcoding video '{filename}' to {screen_width}x{screen_height} MJPEG (first run only)...")
+    tmp_path = cache_path + ".tmp.avi" # Keep .avi suffix so ffmpeg picks the container
+    try:
+        os.makedirs(MEDIA_CACHE_FOLDER, exist_ok=True)
+        _prune_media_cache(cache_path)
+        subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-i", src_path,
+                        "-vf", f"scale={screen_width}:{screen_height}", "-c:v", "mjpeg", "-q:v", "3", "-an",
+                        tmp_path], check=True)
+        os.replace(tmp_path, cache_path)
+        return cache_path
+    except Exception as e:
+        print(f"Warning: Could not transcode video {filename}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return src_path
+
 try:
-    all_files = sorted([f for f in os.listdir(MEDIA_FOLDER) if os.path.isfile(os.path.join(MEDIA_FOLDER, f))])
-    media_files = [f for f in all_files if f.lower().endswith((".png", ".jpg", ".jpeg", ".mp4", ".avi", ".mov"))]
+    # Single directory pass: scandir's cached entry type avoids a stat() per name
+    with os.scandir(MEDIA_FOLDER) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            ext = os.path.splitext(entry.name)[1].lower()
+            if ext in IMAGE_EXTENSIONS:
+                image_files.append(entry.name)
+                media_kind[entry.name] = "image"
+            elif ext in VIDEO_EXTENSIONS:
+                video_files.append(entry.name)
+                media_kind[entry.name] = "video"
+    image_files.sort()
+    video_files.sort()
+    media_files = sorted(image_files + video_files)
+    media_paths = tuple(os.path.join(MEDIA_FOLDER, f) for f in media_files)
 
     if len(media_files) < STARTUP_MEDIA_COUNT:
         print(f"Error: Only {len(media_files)} media files found in {MEDIA_FOLDER}, need at least {STARTUP_MEDIA_COUNT}.")
         # Allow continuing but some buttons might not work
         # pygame.quit() sys.exit() removed to allow partial function
 
-    for f in media_files:
-        if f.lower().endswith((".png", ".jpg", ".jpeg")):
-            img_path = os.path.join(MEDIA_FOLDER, f)
+    # Decode/scale in parallel (pygame releases the GIL for both); convert() needs the display, so do it here
+    with ThreadPoolExecutor(max_workers=IMAGE_PRELOAD_WORKERS) as executor:
+        futures = [(f, executor.submit(load_screen_image, f)) for f in image_files]
+        for f, future in futures:
             try:
-                image = pygame.image.load(img_path).convert() # Use convert() for potential speedup
-                image = pygame.transform.scale(image, (screen_width, screen_height))
-                preloaded_images[f] = image
+                # convert() to the display's pixel format so every later blit is a plain copy (no alpha: never convert_alpha)
+                preloaded_images[f] = future.result().convert()
             except Exception as e:
-                print(f"Error preloading image {img_path}: {e}")
+                print(f"Error preloading image {os.path.join(MEDIA_FOLDER, f)}: {e}")
+    for f in video_files:
+        video_paths[f] = get_screen_video(f)
     print(f"Found {len(media_files)} media files. Preloaded {len(preloaded_images)} images.")
 
 except FileNotFoundError:
@@ -131,6 +320,55 @@ except Exception as e:
 
 # --- Helper Functions ---
 
+def is_quit_event(event):
+    """True for the window-close event or an ESC key press."""
+    return event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE)
+
+def _input_from_event(event):
+    """Maps an event to 'QUIT', a button pin, or None for anything else."""
+    if event.type == BUTTON_EVENT:
+        return event.pin
+    if is_quit_event(event):
+        return "QUIT"
+    return None
+
+def poll_input():
+    """Returns 'QUIT' or a button pin for the first such pending event, or None if there is none.
+    Never blocks. Polls one event at a time (set_blocked keeps the queue to the types handled here),
+    so no list is built."""
+    event = pygame.event.poll()
+    while event.type != pygame.NOEVENT:
+        result = _input_from_event(event)
+        if result is not None:
+            return result
+        event = pygame.event.poll()
+    return None
+
+def wait_for_input(timeout=None):
+    """The single wait point for keys and buttons: blocks in pygame.event.wait() for up to `timeout`
+    seconds (None waits indefinitely). Returns 'QUIT', the pin, or None on timeout."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        if deadline is None:
+            event = pygame.event.wait(MAX_INPUT_WAIT_MS)
+        else:
+            wait_ms = int((deadline - time.monotonic()) * 1000)
+            if wait_ms <= 0:
+                return poll_input()
+            event = pygame.event.wait(min(wait_ms, MAX_INPUT_WAIT_MS)) # Loop re-checks the deadline
+        result = _input_from_event(event)
+        if result is not None:
+            return result
+
+def wait_for_media_input(interrupt_pins, timeout=None):
+    """Waits until QUIT/ESC, a press of one of `interrupt_pins`, or `timeout` seconds (None waits
+    indefinitely). Presses of other buttons are ignored. Returns 'QUIT', the pin, or None on timeout."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        result = wait_for_input(None if deadline is None else deadline - time.monotonic())
+        if result is None or result == "QUIT" or result in interrupt_pins:
+            return result
+
 def check_modbus_connection():
     """Checks and attempts to establish Modbus connection."""
     global modbus_connected
@@ -153,44 +391,95 @@ def check_modbus_connection():
         modbus_connected = True
     return modbus_connected
 
-def read_modbus_float32(address):
-    """Reads a 32-bit float from two Modbus holding registers."""
+def read_modbus_registers(address, count):
+    """Reads `count` Modbus holding registers starting at `address`. Returns the register list, or None on failure."""
     global modbus_connected
     if not modbus_connected:
         if not check_modbus_connection():
-            return 0.0 # Return default if connection fails
+            return None # Connection failed
 
     try:
-        response = client.read_holding_registers(address, 2, unit=MODBUS_UNIT_ID)
+        response = client.read_holding_registers(address, count, unit=MODBUS_UNIT_ID)
         if response.isError():
             print(f"Modbus read error (Addr {address}): {response}")
             modbus_connected = False # Assume disconnect on error
-            return 0.0
-        decoder = BinaryPayloadDecoder.fromRegisters(response.registers, Endian.Big, wordorder=Endian.Little)
-        value = decoder.decode_32bit_float()
+            return None
+        if len(response.registers) < count:
+            print(f"Modbus short read (Addr {address}): got {len(response.registers)} of {count} registers")
+            return None
         modbus_connected = True # Mark as connected after successful read
-        return value
+        return response.registers
     except ConnectionException as e:
         print(f"Modbus ConnectionException during read (Addr {address}): {e}")
         modbus_connected = False
         client.close() # Ensure socket is closed on connection exception
-        return 0.0
+        return None
     except Exception as e:
         print(f"Exception during Modbus read (Addr {address}): {e}")
         # Consider closing connection here too depending on error type
         # modbus_connected = False
         # client.close()
-        return 0.0
-
-def read_voltage():
-    """Reads voltage via Modbus."""
-    # Address 142 expected
-    return read_modbus_float32(142)
+        return None
 
-def read_current():
-    """Reads current via Modbus."""
-     # Address 150 expected
-    return read_modbus_float32(150)
+# Big-endian bytes with little-endian word order: packing both words little-endian and reading the
+# float little-endian yields exactly the (high word, low word) big-endian float.
+_REGISTER_PAIR = struct.Struct("<HH")
+_FLOAT32 = struct.Struct("<f")
+
+def decode_float32(registers):
+    """Decodes a 32-bit float from two registers (big-endian bytes, little-endian word order)."""
+    return _FLOAT32.unpack(_REGISTER_PAIR.pack(registers[0], registers[1]))[0]
+
+def read_voltage_current():
+    """Reads (voltage, current), or returns None if the read fails. With MODBUS_BATCH_READ, one
+    transaction covers both registers, halving the RTU request/response and inter-frame overhead."""
+    if not MODBUS_BATCH_READ:
+        voltage_registers = read_modbus_registers(MODBUS_VOLTAGE_ADDRESS, 2)
+        current_registers = read_modbus_registers(MODBUS_CURRENT_ADDRESS, 2) if voltage_registers else None
+        if not current_registers:
+            return None
+        return decode_float32(voltage_registers), decode_float32(current_registers)
+    count = MODBUS_CURRENT_ADDRESS - MODBUS_VOLTAGE_ADDRESS + 2
+    registers = read_modbus_registers(MODBUS_VOLTAGE_ADDRESS, count)
+    if not registers:
+        return None
+    current_offset = MODBUS_CURRENT_ADDRESS - MODBUS_VOLTAGE_ADDRESS
+    return decode_float32(registers[0:2]), decode_float32(registers[current_offset:current_offset + 2])
+
+# --- Background Sensor Polling ---
+# Latest raw (voltage, current), published by the sensor thread. The lock keeps the pair consistent;
+# it is only held for the tuple swap, never across serial I/O.
+latest_reading = (0.0, 0.0)
+sensor_lock = threading.Lock()
+sensor_stop_event = threading.Event()
+
+def _sensor_worker():
+    """Polls the Modbus meter until `sensor_stop_event` is set, so serial I/O never stalls the display."""
+    global latest_reading
+    last_good_time = time.monotonic()
+    while not sensor_stop_event.is_set():
+        reading = read_voltage_current()
+        now = time.monotonic()
+        if reading is not None:
+            last_good_time = now
+        elif now - last_good_time > MODBUS_STALE_AFTER:
+            reading = (0.0, 0.0) # Meter gone for a while: stop showing old values
+        if reading is not None: # A brief failure keeps the last good reading on screen
+            with sensor_lock:
+                latest_reading = reading
+        sensor_stop_event.wait(MODBUS_READ_INTERVAL) # Sleeps, but wakes at once on shutdown
+
+def get_latest_reading():
+    """Returns the most recent (voltage, current) without blocking on the meter."""
+    with sensor_lock:
+        return latest_reading
+
+sensor_thread = threading.Thread(target=_sensor_worker, name="modbus-poller", daemon=True)
+
+@lru_cache(maxsize=64) # Values repeat a lot; each entry is a full-height text surface, so keep it small
+def render_value_text(text, color):
+    """Renders a sensor value string in the value font, memoized on (text, color)."""
+    return font_value.render(text, True, color)
 
 def calculate_power(voltage, current):
     """Calculates power. Handles potential None or non-numeric inputs."""
@@ -199,83 +488,222 @@ def calculate_power(voltage, current):
     return abs(v * c) # Often power is positive, but depends on meter
 
 
-def play_video_cv(video_path, interrupt_pins):
-    """Plays a video using OpenCV until interrupted by specified pins or ESC."""
+def open_video_capture(video_path):
+    """Opens a video for playback. H.264 .mp4/.mov files go through a GStreamer pipeline that decodes
+    on the Pi's V4L2 hardware decoder and outputs screen-sized BGR frames; everything else, or any
+    file that pipeline can't open, uses OpenCV's default backend."""
+    if uses_hw_decode(video_path):
+        # Scale while still in YUV (fewer bytes), then convert straight to the BGR the display path expects
+        pipeline = (f'filesrc location="{video_path}" ! qtdemux ! h264parse ! v4l2h264dec ! '
+                    f'videoscale ! video/x-raw,width={screen_width},height={screen_height} ! '
+                    'videoconvert ! video/x-raw,format=BGR ! appsink max-buffers=2')
+        cap = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
+        if cap.isOpened():
+            return cap
+        cap.release()
+        print(f"Hardware decode pipeline failed for {video_path}, using default decoder.")
+    return cv2.VideoCapture(video_path)
+
+video_captures = {} # path -> opened capture kept between playbacks (see CACHE_VIDEO_CAPTURES)
+
+def acquire_video_capture(video_path):
+    """Returns a capture for `video_path` positioned at its first frame. Reuses the cached one if
+    it can be rewound, otherwise opens a fresh one."""
+    cap = video_captures.pop(video_path, None)
+    if cap is not None:
+        if cap.set(cv2.CAP_PROP_POS_FRAMES, 0):
+            return cap
+        cap.release()
+    return open_video_capture(video_path)
+
+def release_video_capture(video_path, cap):
+    """Hands a capture back after playback. Seekable captures are cached for the next playback;
+    GStreamer pipelines are released, since they may not seek and each one holds a hardware decoder."""
+    # A decoder abandoned after a stall may hand its capture back late; keep only one per path
+    if CACHE_VIDEO_CAPTURES and video_path not in video_captures and cap.isOpened() and cap.getBackendName() != "GSTREAMER":
+        video_captures[video_path] = cap
+    else:
+        cap.release()
+
+def preopen_video_captures():
+    """Opens every video once up front so the first press of a video button doesn't pay for it.
+    Hardware-decoded files are skipped: their GStreamer captures are never cached."""
+    if not CACHE_VIDEO_CAPTURES:
+        return
+    for video_path in video_paths.values():
+        if not uses_hw_decode(video_path):
+            release_video_capture(video_path, open_video_capture(video_path))
+    print(f"Opened {len(video_captures)} video captures for reuse.")
+
+def release_all_video_captures():
+    """Releases every cached capture (called at exit)."""
+    for cap in video_captures.values():
+        cap.release()
+    video_captures.clear()
+
+def _video_decoder(video_path, cap, frame_surfaces, frame_queue, stop_event, frame_dt):
+    """Decoder thread for play_video_cv. Grabs frames on the wall-clock schedule, decodes and
+    resizes only the ones that aren't already late, converts them into the next of the reused
+    display-format `frame_surfaces`, and queues (due_time, surface) pairs.
+    Takes ownership of `cap` and hands it back via `release_video_capture` on exit."""
+    next_show = time.monotonic() # Wall-clock time the next grabbed frame is due
+    resize_buffer = None # Reused resize target, allocated on first resize
+    # The ring holds one surface per queue slot plus the frame being displayed and the one being
+    # written, so a surface is only overwritten after the main loop has blitted it.
+    surface_index = 0
+    try:
+        while not stop_event.is_set():
+            if not cap.grab():
+                # Loop the video (GStreamer pipelines may not seek, so reopen instead)
+                if not cap.set(cv2.CAP_PROP_POS_FRAMES, 0):
+                    cap.release()
+                    cap = open_video_capture(video_path)
+                    if not cap.isOpened():
+                        print(f"Error reopening video: {video_path}")
+                        break
+                continue
+
+            # --- Frame Pacing ---
+            due = next_show
+            next_show += frame_dt
+            if time.monotonic() - due > frame_dt:
+                continue # More than a frame behind: drop this one without decoding it
+            # --- End Pacing ---
+
+            ret, frame = cap.retrieve()
+            if not ret:
+                continue
+            # Performance: Cached videos are already screen-sized; only resize originals
+            if frame.shape[1] != screen_width or frame.shape[0] != screen_height:
+                if resize_buffer is None:
+                    resize_buffer = np.empty((screen_height, screen_width, 3), dtype=np.uint8)
+                frame = cv2.resize(frame, (screen_width, screen_height), dst=resize_buffer,
+                                   interpolation=cv2.INTER_NEAREST) # INTER_NEAREST is fastest
+            # Performance: Wrap OpenCV's BGR pixels directly (no cvtColor pass, no swapaxes copy, no tobytes copy)
+            frame_buffer = frame if frame.flags['C_CONTIGUOUS'] else frame.tobytes()
+            bgr_surface = pygame.image.frombuffer(frame_buffer, (screen_width, screen_height), "BGR")
+            # Convert to the display's pixel format here, off the main thread, so its blit is a plain copy
+            frame_surface = frame_surfaces[surface_index]
+            frame_surface.blit(bgr_surface, (0, 0))
+            surface_index = (surface_index + 1) % len(frame_surfaces)
+
+            # Block while the display is VIDEO_QUEUE_SIZE frames ahead, but keep honouring stop_event
+            while not stop_event.is_set():
+                try:
+                    frame_queue.put((due, frame_surface), timeout=VIDEO_POLL_INTERVAL)
+                    break
+                except queue.Full:
+                    pass
+    except Exception as e:
+        print(f"Error in video decoder thread: {e}")
+        traceback.print_exc()
+    finally:
+        release_video_capture(video_path, cap)
+
+
+_frame_surface_ring = [] # Display-format frame surfaces shared by every playback (see get_frame_surfaces)
+
+def get_frame_surfaces():
+    """Returns the ring of screen-sized, display-format surfaces the decoder writes frames into.
+    Allocated on first playback (or if the screen size changes) and reused afterwards; playbacks
+    never share a ring: each one joins its decoder before returning, or discards the ring if it stalls."""
+    global _frame_surface_ring
+    size = (screen_width, screen_height)
+    if not _frame_surface_ring or _frame_surface_ring[0].get_size() != size:
+        _frame_surface_ring = [pygame.Surface(size, 0, screen) for _ in range(VIDEO_QUEUE_SIZE + 2)]
+    return _frame_surface_ring
+
+def discard_frame_surfaces():
+    """Forgets the current ring so the next get_frame_surfaces() call allocates a new one."""
+    global _frame_surface_ring
+    _frame_surface_ring = []
+
+
+def play_video_cv(video_path, interrupt_pins, timeout=None):
+    """Plays a video using OpenCV until interrupted by specified pins or ESC.
+
+    If `timeout` (seconds) is given, playback also ends after that long and None is returned.
+    Decoding runs on a background thread (see `_video_decoder`); this loop only blits ready
+    surfaces at their due time and services input, so buttons stay responsive during decode.
+    """
     cap = None
+    decoder = None
+    stop_event = threading.Event()
+    frame_queue = queue.Queue(maxsize=VIDEO_QUEUE_SIZE)
     pressed_pin = None
-    clock = pygame.time.Clock()
     try:
-        cap = cv2.VideoCapture(video_path)
+        cap = acquire_video_capture(video_path)
         if not cap.isOpened():
             print(f"Error opening video: {video_path}")
+            cap.release()
             return None
 
         frame_rate = cap.get(cv2.CAP_PROP_FPS)
         if not frame_rate or frame_rate <= 0:
             frame_rate = 30.0
             print(f"Warning: Invalid frame rate for {video_path}, defaulting to {frame_rate}")
-        frame_time_ms = int(1000.0 / frame_rate)
 
+        frame_surfaces = get_frame_surfaces()
+        decoder = threading.Thread(target=_video_decoder,
+                                   args=(video_path, cap, frame_surfaces, frame_queue, stop_event, 1.0 / frame_rate), daemon=True)
+        decoder.start()
+
+        start_time = time.monotonic()
         playing = True
         while playing:
-            ret, frame = cap.read()
-            if not ret:
-                # Option 1: Loop the video
-                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                continue
-                # Option 2: Stop playback
-                # playing = False
-                # continue
+            if timeout is not None and time.monotonic() - start_time >= timeout:
+                break # Timed playback finished without interruption
 
             # --- Event and Button Checking ---
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
-                    print("Video interrupted by QUIT/ESC.")
-                    playing = False
-                    pressed_pin = "QUIT"
-                    break # Exit event loop
-
-            if not playing: break # Exit main loop if quit event detected
-
-            for pin in interrupt_pins:
-                if GPIO.input(pin) == GPIO.HIGH:
-                     # Minimal debounce inside loop
-                     time.sleep(0.02)
-                     if GPIO.input(pin) == GPIO.HIGH:
-                        print(f"Video interrupted by button {pin}.")
-                        playing = False
-                        pressed_pin = pin
-                        break # Exit button loop
-            if not playing: break # Exit main loop if button detected
+            pin = poll_input()
+            if pin == "QUIT":
+                print("Video interrupted by QUIT/ESC.")
+                pressed_pin = "QUIT"
+                break # Exit main loop
+            if pin in interrupt_pins:
+                print(f"Video interrupted by button {pin}.")
+                pressed_pin = pin
+                break # Exit main loop if button detected
             # --- End Checking ---
 
+            try:
+                due, frame_surface = frame_queue.get(timeout=VIDEO_POLL_INTERVAL)
+            except queue.Empty:
+                if not decoder.is_alive():
+                    print(f"Video decoder stopped unexpectedly: {video_path}")
+                    break
+                continue # Nothing ready yet; go back to checking input
 
             # --- Frame Display ---
+            wait_ms = int((due - time.monotonic()) * 1000)
+            if wait_ms > 0:
+                pygame.time.wait(wait_ms) # Hold the frame until it is due
             try:
-                # Performance: Resize first
-                frame = cv2.resize(frame, (screen_width, screen_height), interpolation=cv2.INTER_NEAREST) # INTER_NEAREST is fastest
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) # Essential conversion
-                # Performance: Direct surface creation (avoids extra copy with swapaxes if possible)
-                frame_surface = pygame.image.frombuffer(frame.tobytes(), (screen_width, screen_height), "RGB")
-                # Previous method (if frombuffer fails or looks wrong):
-                # frame_surface = pygame.surfarray.make_surface(frame.swapaxes(0, 1))
                 screen.blit(frame_surface, (0, 0))
                 pygame.display.flip() # Use flip with double buffering
             except Exception as e:
-                 print(f"Error processing/displaying video frame: {e}")
+                 print(f"Error displaying video frame: {e}")
                  playing = False # Stop on error
             # --- End Frame Display ---
 
-            # clock.tick(frame_rate) # Caps FPS but can cause drift
-            pygame.time.wait(max(1, frame_time_ms - VIDEO_FRAME_WAIT_SAFETY_MARGIN_MS)) # Alternative timing
-
     except Exception as e:
         print(f"Error during video playback: {e}")
         traceback.print_exc()
     finally:
-        if cap:
-            cap.release()
-            print(f"Released video capture for {video_path}")
+        stop_event.set()
+        if decoder:
+            decoder.join(timeout=VIDEO_DECODER_JOIN_TIMEOUT) # The decoder owns cap and hands it back on exit
+            if decoder.is_alive():
+                # Stuck in grab()/retrieve(); it is a daemon thread, so leave it behind rather than hang the UI.
+                # It may still write into its surfaces, so the next playback gets a fresh ring.
+                print(f"Warning: Video decoder for {video_path} did not stop within {VIDEO_DECODER_JOIN_TIMEOUT}s; abandoning it.")
+                discard_frame_surfaces()
+            # Drop undisplayed frames now; the ring surfaces they point at are reused by the next playback
+            while not frame_queue.empty():
+                frame_queue.get_nowait()
+            print(f"Finished playback of {video_path}")
+        elif cap and cap.isOpened():
+            release_video_capture(video_path, cap)
     return pressed_pin
 
 
@@ -293,29 +721,11 @@ def display_static_image(image_filename, interrupt_pins):
         time.sleep(2) # Show error briefly
         return None
 
-    waiting = True
-    pressed_pin = None
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
-                print("Image display interrupted by QUIT/ESC.")
-                waiting = False
-                pressed_pin = "QUIT"
-                break
-        if not waiting: break
-
-        for pin in interrupt_pins:
-            if GPIO.input(pin) == GPIO.HIGH:
-                 # Minimal debounce
-                 time.sleep(0.02)
-                 if GPIO.input(pin) == GPIO.HIGH:
-                    print(f"Image display interrupted by button {pin}.")
-                    waiting = False
-                    pressed_pin = pin
-                    break
-        if not waiting: break
-
-        pygame.time.wait(MEDIA_WAIT_MS) # Reduce CPU usage
+    pressed_pin = wait_for_media_input(interrupt_pins)
+    if pressed_pin == "QUIT":
+        print("Image display interrupted by QUIT/ESC.")
+    else:
+        print(f"Image display interrupted by button {pressed_pin}.")
     return pressed_pin
 
 def display_media(media_path):
@@ -323,10 +733,11 @@ def display_media(media_path):
     filename = os.path.basename(media_path)
     interrupt_pins = BUTTON_PINS # Allow any button to interrupt media playback
 
-    if filename.lower().endswith((".png", ".jpg", ".jpeg")):
+    kind = media_kind.get(filename)
+    if kind == "image":
         return display_static_image(filename, interrupt_pins)
-    elif filename.lower().endswith((".mp4", ".avi", ".mov")):
-        return play_video_cv(media_path, interrupt_pins)
+    elif kind == "video":
+        return play_video_cv(video_paths.get(filename, media_path), interrupt_pins)
     else:
         print(f"Error: Unsupported media type or file not found: {media_path}")
         return None
@@ -334,19 +745,17 @@ def display_media(media_path):
 
 # --- Sensor Display Screen ---
 
-# Pre-render static elements for the sensor display
-title_surf = font_title.render("Hand Tool Monitor", True, COLOR_YELLOW)
+# Pre-render static elements for the sensor display (converted once to the display format for cheap blits)
+title_surf = font_title.render("Hand Tool Monitor", True, COLOR_YELLOW).convert_alpha()
 title_rect = title_surf.get_rect(center=(screen_width // 2, int(screen_height * 0.07)))
 
-power_label_surf = font_label.render("POWER", True, COLOR_BLACK)
-voltage_label_surf = font_label.render("VOLTAGE", True, COLOR_BLACK)
-current_label_surf_black = font_label.render("CURRENT", True, COLOR_BLACK)
-current_label_surf_white = font_label.render("CURRENT", True, COLOR_WHITE) # For red background
+power_label_surf = font_label.render("POWER", True, COLOR_BLACK).convert_alpha()
+voltage_label_surf = font_label.render("VOLTAGE", True, COLOR_BLACK).convert_alpha()
+current_label_surf = font_label.render("CURRENT", True, COLOR_BLACK).convert_alpha()
 
-power_unit_surf = font_value.render("W", True, COLOR_BLACK)
-voltage_unit_surf = font_value.render("V", True, COLOR_BLACK)
-current_unit_surf_black = font_value.render("A", True, COLOR_BLACK)
-current_unit_surf_white = font_value.render("A", True, COLOR_WHITE) # For red background
+power_unit_surf = font_value.render("W", True, COLOR_BLACK).convert_alpha()
+voltage_unit_surf = font_value.render("V", True, COLOR_BLACK).convert_alpha()
+current_unit_surf = font_value.render("A", True, COLOR_BLACK).convert_alpha()
 
 # Calculate layout dimensions once
 section_width = int(screen_width * 0.75)
@@ -369,64 +778,80 @@ unit_x = section_x + int(section_width * 0.9) # Unit X (right aligned)
 
 power_label_rect = power_label_surf.get_rect(center=(label_x, y_power + section_height // 2))
 voltage_label_rect = voltage_label_surf.get_rect(center=(label_x, y_voltage + section_height // 2))
-current_label_rect_black = current_label_surf_black.get_rect(center=(label_x, y_current + section_height // 2))
-current_label_rect_white = current_label_surf_white.get_rect(center=(label_x, y_current + section_height // 2))
+current_label_rect = current_label_surf.get_rect(center=(label_x, y_current + section_height // 2))
 
 power_unit_rect = power_unit_surf.get_rect(center=(unit_x, y_power + section_height // 2))
 voltage_unit_rect = voltage_unit_surf.get_rect(center=(unit_x, y_voltage + section_height // 2))
-current_unit_rect_black = current_unit_surf_black.get_rect(center=(unit_x, y_current + section_height // 2))
-current_unit_rect_white = current_unit_surf_white.get_rect(center=(unit_x, y_current + section_height // 2))
+current_unit_rect = current_unit_surf.get_rect(center=(unit_x, y_current + section_height // 2))
+
+# Per-frame drawing positions (value text centers, the blinking current section)
+value_center_x = value_x + value_width // 2
+power_value_center = (value_center_x, y_power + section_height // 2)
+voltage_value_center = (value_center_x, y_voltage + section_height // 2)
+current_value_center = (value_center_x, y_current + section_height // 2)
+power_section_rect = pygame.Rect(section_x, y_power, section_width, section_height)
+voltage_section_rect = pygame.Rect(section_x, y_voltage, section_width, section_height)
+current_section_rect = pygame.Rect(section_x, y_current, section_width, section_height)
+
+
+def _build_static_bg():
+    """Draws everything on the sensor display that never changes (title, boxes, labels, units) onto one surface."""
+    bg = pygame.Surface((screen_width, screen_height)).convert()
+    bg.fill(COLOR_BLACK)
+    bg.blit(title_surf, title_rect)
+    for y in (y_power, y_voltage, y_current):
+        pygame.draw.rect(bg, COLOR_WHITE, (section_x, y, section_width, section_height), border_radius=border_radius)
+        pygame.draw.rect(bg, COLOR_BLACK, (value_x, y + padding, value_width, value_box_height), border_radius=value_box_radius)
+    bg.blit(power_label_surf, power_label_rect)
+    bg.blit(power_unit_surf, power_unit_rect)
+    bg.blit(voltage_label_surf, voltage_label_rect)
+    bg.blit(voltage_unit_surf, voltage_unit_rect)
+    bg.blit(current_label_surf, current_label_rect)
+    bg.blit(current_unit_surf, current_unit_rect)
+    return bg
+
+def _build_current_alert_bg():
+    """Draws the blinking (red) state of the current section, with white label and unit, onto a section-sized surface."""
+    bg = pygame.Surface(current_section_rect.size).convert()
+    bg.fill(COLOR_BLACK)
+    offset_x, offset_y = -current_section_rect.x, -current_section_rect.y
+    pygame.draw.rect(bg, COLOR_RED, bg.get_rect(), border_radius=border_radius)
+    pygame.draw.rect(bg, COLOR_BLACK, (value_x + offset_x, padding, value_width, value_box_height), border_radius=value_box_radius)
+    bg.blit(font_label.render("CURRENT", True, COLOR_WHITE), current_label_rect.move(offset_x, offset_y))
+    bg.blit(font_value.render("A", True, COLOR_WHITE), current_unit_rect.move(offset_x, offset_y))
+    return bg
+
+sensor_bg_surf = _build_static_bg()
+current_alert_bg_surf = _build_current_alert_bg()
 
 
 def display_voltage_current():
     """Displays voltage, current, and power with Modbus sensor data."""
     running = True
-    last_read_time = 0
-    voltage, current, power = 0.0, 0.0, 0.0
-    voltage_surf, current_surf, power_surf = None, None, None # Surfaces for values
+    frame_time = 1.0 / SENSOR_DISPLAY_FPS
+    # What each section currently shows; a section is only redrawn (and pushed to the display) when this changes
+    shown_power_text = shown_voltage_text = shown_current_text = None
+    shown_current_box_color = None
+
+    # Static title, boxes, labels and units (pre-rendered, also clears the screen); shown with the first frame
+    screen.blit(sensor_bg_surf, (0, 0))
+    full_update = True
 
     while running:
-        loop_start_time = time.monotonic() # More precise for timing loops
-
-        # --- Check Events and Buttons ---
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
-                print("Sensor display interrupted by QUIT/ESC.")
-                running = False
-                return "QUIT"
-
-        for pin in BUTTON_PINS:
-            if GPIO.input(pin) == GPIO.HIGH:
-                 time.sleep(0.02) # Debounce
-                 if GPIO.input(pin) == GPIO.HIGH:
-                    print(f"Button {pin} pressed, exiting sensor display.")
-                    running = False
-                    return pin # Return pressed pin
-        # --- End Check ---
-
-        # --- Read Modbus Data Periodically ---
-        now = time.monotonic()
-        if now - last_read_time >= MODBUS_READ_INTERVAL:
-            voltage = read_voltage()
-            current = read_current()
-            # Basic Filtering/Thresholding
-            voltage = voltage if voltage > 5.0 else 0.0 # Ignore very low voltage readings
-            current = current if current > 0.1 else 0.00 # Ignore very low current readings
-            power = calculate_power(voltage, current)
-
-            # --- Re-render value surfaces ONLY when data changes ---
-            power_surf = font_value.render(f"{power:.0f}", True, COLOR_YELLOW) # Integer Watts often fine
-            voltage_surf = font_value.render(f"{voltage:.1f}", True, COLOR_YELLOW)
-            current_surf = font_value.render(f"{current:.1f}", True, COLOR_YELLOW)
-            last_read_time = now
-            # print(f"Read V:{voltage:.1f} I:{current:.1f} P:{power:.0f}") # Optional debug
-        # --- End Modbus Read ---
-
-        # --- Drawing ---
-        screen.fill(COLOR_BLACK) # Clear screen
-
-        # Draw Title (pre-rendered)
-        screen.blit(title_surf, title_rect)
+        frame_start_time = time.monotonic()
+
+        # --- Pick Up Latest Readings (polled by the sensor thread, never blocks) ---
+        voltage, current = get_latest_reading()
+        # Basic Filtering/Thresholding
+        voltage = voltage if voltage > 5.0 else 0.0 # Ignore very low voltage readings
+        current = current if current > 0.1 else 0.00 # Ignore very low current readings
+        power = calculate_power(voltage, current)
+
+        power_text = f"{power:.0f}" # Integer Watts often fine
+        voltage_text = f"{voltage:.1f}"
+        current_text = f"{current:.1f}"
+        # print(f"Read V:{voltage_text} I:{current_text} P:{power_text}") # Optional debug
+        # --- End Readings ---
 
         # Determine current box color (blinking)
         pygame_time_ms = pygame.time.get_ticks()
@@ -435,47 +860,90 @@ def display_voltage_current():
             if (pygame_time_ms // 400) % 2 == 0: # Faster blink
                 current_box_color = COLOR_RED
 
-        # --- Draw Sections ---
-        # Power
-        pygame.draw.rect(screen, COLOR_WHITE, (section_x, y_power, section_width, section_height), border_radius=border_radius)
-        pygame.draw.rect(screen, COLOR_BLACK, (value_x, y_power + padding, value_width, value_box_height), border_radius=value_box_radius)
-        screen.blit(power_label_surf, power_label_rect)
-        if power_surf: screen.blit(power_surf, power_surf.get_rect(center=(value_x + value_width // 2, y_power + section_height // 2)))
-        screen.blit(power_unit_surf, power_unit_rect)
-
-        # Voltage
-        pygame.draw.rect(screen, COLOR_WHITE, (section_x, y_voltage, section_width, section_height), border_radius=border_radius)
-        pygame.draw.rect(screen, COLOR_BLACK, (value_x, y_voltage + padding, value_width, value_box_height), border_radius=value_box_radius)
-        screen.blit(voltage_label_surf, voltage_label_rect)
-        if voltage_surf: screen.blit(voltage_surf, voltage_surf.get_rect(center=(value_x + value_width // 2, y_voltage + section_height // 2)))
-        screen.blit(voltage_unit_surf, voltage_unit_rect)
-
-        # Current (with dynamic background color)
-        pygame.draw.rect(screen, current_box_color, (section_x, y_current, section_width, section_height), border_radius=border_radius)
-        pygame.draw.rect(screen, COLOR_BLACK, (value_x, y_current + padding, value_width, value_box_height), border_radius=value_box_radius)
-        # Select appropriate pre-rendered label/unit based on background
-        current_label_to_blit = current_label_surf_white if current_box_color == COLOR_RED else current_label_surf_black
-        current_unit_to_blit = current_unit_surf_white if current_box_color == COLOR_RED else current_unit_surf_black
-        current_label_rect_to_use = current_label_rect_white if current_box_color == COLOR_RED else current_label_rect_black
-        current_unit_rect_to_use = current_unit_rect_white if current_box_color == COLOR_RED else current_unit_rect_black
-
-        screen.blit(current_label_to_blit, current_label_rect_to_use)
-        if current_surf: screen.blit(current_surf, current_surf.get_rect(center=(value_x + value_width // 2, y_current + section_height // 2)))
-        screen.blit(current_unit_to_blit, current_unit_rect_to_use)
-        # --- End Draw Sections ---
-
-
-        pygame.display.flip() # Update the full screen
+        # --- Drawing (dirty sections only) ---
+        # Each changed section is restored from the background, then gets its value
+        # (value surfaces are only rasterized the first time a string is seen)
+        dirty_rects = []
+        if power_text != shown_power_text:
+            screen.blit(sensor_bg_surf, power_section_rect, power_section_rect)
+            power_surf = render_value_text(power_text, COLOR_YELLOW)
+            screen.blit(power_surf, power_surf.get_rect(center=power_value_center))
+            dirty_rects.append(power_section_rect)
+            shown_power_text = power_text
+
+        if voltage_text != shown_voltage_text:
+            screen.blit(sensor_bg_surf, voltage_section_rect, voltage_section_rect)
+            voltage_surf = render_value_text(voltage_text, COLOR_YELLOW)
+            screen.blit(voltage_surf, voltage_surf.get_rect(center=voltage_value_center))
+            dirty_rects.append(voltage_section_rect)
+            shown_voltage_text = voltage_text
+
+        if current_text != shown_current_text or current_box_color != shown_current_box_color:
+            if current_box_color == COLOR_RED:
+                screen.blit(current_alert_bg_surf, current_section_rect)
+            else:
+                screen.blit(sensor_bg_surf, current_section_rect, current_section_rect)
+            current_surf = render_value_text(current_text, COLOR_YELLOW)
+            screen.blit(current_surf, current_surf.get_rect(center=current_value_center))
+            dirty_rects.append(current_section_rect)
+            shown_current_text = current_text
+            shown_current_box_color = current_box_color
+
+        if full_update:
+            pygame.display.flip() # First frame: push the whole screen, including the title
+            full_update = False
+        elif dirty_rects:
+            pygame.display.update(dirty_rects) # Partial on non-SCALED modes, a full present under SCALED; idle frames push nothing
         # --- End Drawing ---
 
-        # Control loop speed
-        elapsed_ms = (time.monotonic() - loop_start_time) * 1000
-        wait_ms = max(1, SENSOR_DISPLAY_WAIT_MS - int(elapsed_ms))
-        pygame.time.wait(wait_ms)
+        # Control loop speed: wait for input for the rest of the frame,
+        # so a press or ESC wakes the loop immediately instead of waiting out a sleep
+        pin = wait_for_input(frame_time - (time.monotonic() - frame_start_time))
+        if pin == "QUIT":
+            print("Sensor display interrupted by QUIT/ESC.")
+            running = False
+            return "QUIT"
+        if pin in BUTTON_PINS:
+            print(f"Button {pin} pressed, exiting sensor display.")
+            running = False
+            return pin # Return pressed pin
 
     return None # Return None if loop exited normally (button press handled)
 
 
+# --- Button Actions ---
+# pin -> (function, args) of the screen each button opens, built once now that media_files is final
+DEFAULT_ACTION = (display_voltage_current, ())
+PIN_ACTIONS = {BUTTON_VOLTAGE_DISPLAY: DEFAULT_ACTION}
+for pin, media_index in BUTTON_MEDIA_MAP.items():
+    if 0 <= media_index < len(media_paths):
+        PIN_ACTIONS[pin] = (display_media, (media_paths[media_index],))
+    else:
+        print(f"Warning: Media index {media_index} out of range for button {pin}; it will show the sensor display.")
+
+def action_for_pin(pin):
+    """Returns the (function, args) action for a button press, defaulting to the sensor display."""
+    action = PIN_ACTIONS.get(pin)
+    if action is None:
+        print(f"Warning: No action mapped for button {pin}. Defaulting.")
+        return DEFAULT_ACTION
+    return action
+
+def next_action_for(result):
+    """Maps how a screen or input wait ended to the next main-loop state: 'QUIT' exits, a button
+    pin opens that button's screen, None idles until input, anything else falls back to the default."""
+    if result is None:
+        return None
+    if result == "QUIT":
+        print("Quit requested.")
+        return "QUIT"
+    if result in BUTTON_PINS:
+        print(f"Button {result} pressed. Queuing next action.")
+        return action_for_pin(result)
+    print(f"Warning: Action returned unexpected value: {result}. Defaulting.")
+    return DEFAULT_ACTION
+
+
 # --- Startup Sequence ---
 
 def run_startup_sequence():
@@ -488,74 +956,24 @@ def run_startup_sequence():
              print(f"Warning: Not enough media files ({len(media_files)}) for full startup sequence ({STARTUP_MEDIA_COUNT}).")
              break
 
-         media_path = os.path.join(MEDIA_FOLDER, media_files[i])
+         media_path = media_paths[i]
          filename = media_files[i]
          interrupt_pins = BUTTON_PINS # Any button can interrupt
 
          pressed_pin = None
-         if filename.lower().endswith((".png", ".jpg", ".jpeg")):
+         kind = media_kind.get(filename)
+         if kind == "image":
              if filename in preloaded_images:
                  print(f"Startup: Displaying image '{filename}'...")
                  screen.blit(preloaded_images[filename], (0,0))
                  pygame.display.flip()
-                 start_time = time.monotonic()
-                 while time.monotonic() - start_time < STARTUP_TIMEOUT:
-                     for event in pygame.event.get(): # Check exit keys
-                         if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
-                             pressed_pin = "QUIT"; break
-                     if pressed_pin: break
-                     for pin in interrupt_pins: # Check buttons
-                         if GPIO.input(pin) == GPIO.HIGH:
-                            time.sleep(0.02) # Debounce
-                            if GPIO.input(pin) == GPIO.HIGH: pressed_pin = pin; break
-                     if pressed_pin: break
-                     pygame.time.wait(50) # Don't hog CPU
+                 pressed_pin = wait_for_media_input(interrupt_pins, timeout=STARTUP_TIMEOUT)
              else:
                  print(f"Startup: Skipping missing image '{filename}'")
                  time.sleep(1) # Still pause briefly
-         elif filename.lower().endswith((".mp4", ".avi", ".mov")):
+         elif kind == "video":
              print(f"Startup: Playing video '{filename}'...")
-             # Simplified video play for timeout - essentially same as play_video_cv but with timeout arg
-             # Reusing play_video_cv by passing timeout and handling result
-             # NOTE: Reimplementing inline is cleaner if `play_video_cv` logic is complex.
-             # Here, just calling `play_video_cv` and checking its result implies it runs indefinitely.
-             # Need a dedicated timed play function or add timeout logic to `play_video_cv`
-             # -- Quick fix: using the `play_video_with_timeout` logic directly here ---
-             start_time = time.monotonic()
-             cap = None
-             try:
-                cap = cv2.VideoCapture(media_path)
-                if cap.isOpened():
-                    frame_rate = cap.get(cv2.CAP_PROP_FPS) or 30.0
-                    frame_time_ms = int(1000.0 / frame_rate)
-                    while time.monotonic() - start_time < STARTUP_TIMEOUT:
-                        ret, frame = cap.read()
-                        if not ret: cap.set(cv2.CAP_PROP_POS_FRAMES, 0); continue
-                        # Check events/buttons
-                        for event in pygame.event.get():
-                           if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
-                               pressed_pin = "QUIT"; break
-                        if pressed_pin: break
-                        for pin in interrupt_pins:
-                            if GPIO.input(pin) == GPIO.HIGH:
-                               time.sleep(0.02)
-                               if GPIO.input(pin) == GPIO.HIGH: pressed_pin = pin; break
-                        if pressed_pin: break
-                        # Display Frame
-                        try:
-                            frame = cv2.resize(frame, (screen_width, screen_height), interpolation=cv2.INTER_NEAREST)
-                            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                            frame_surface = pygame.image.frombuffer(frame.tobytes(), (screen_width, screen_height), "RGB")
-                            screen.blit(frame_surface, (0,0))
-                            pygame.display.flip()
-                        except Exception as e: print(f"Frame display error: {e}"); break # Exit inner loop on error
-                        # Wait
-                        pygame.time.wait(max(1, frame_time_ms - VIDEO_FRAME_WAIT_SAFETY_MARGIN_MS))
-                else: print(f"Failed to open startup video: {filename}")
-             except Exception as e: print(f"Error during startup video play: {e}")
-             finally:
-                 if cap: cap.release()
-             # --- End quick fix video ---
+             pressed_pin = play_video_cv(video_paths.get(filename, media_path), interrupt_pins, timeout=STARTUP_TIMEOUT)
 
          else:
               print(f"Startup: Skipping unsupported file '{filename}'")
@@ -563,164 +981,75 @@ def run_startup_sequence():
 
 
          # --- Handle result of startup item ---
-         if pressed_pin == "QUIT":
-             print("Startup interrupted by QUIT.")
-             next_action = "QUIT" # Signal main loop to exit
-             startup_interrupted = True
-             break
-         elif pressed_pin in BUTTON_PINS:
-             print(f"Startup interrupted by button {pressed_pin}.")
-             # Map button press directly to an action
-             if pressed_pin == BUTTON_VOLTAGE_DISPLAY:
-                 next_action = display_voltage_current
-             elif pressed_pin in BUTTON_MEDIA_MAP:
-                 media_index = BUTTON_MEDIA_MAP[pressed_pin]
-                 if 0 <= media_index < len(media_files):
-                     media_path = os.path.join(MEDIA_FOLDER, media_files[media_index])
-                     next_action = lambda p=media_path: display_media(p) # Use lambda to capture path
-                 else:
-                      print(f"Warning: Media index {media_index} out of range for button {pressed_pin}.")
-                      next_action = display_voltage_current # Default fallback
-             else:
-                 print(f"Warning: No action defined for startup interrupt button {pressed_pin}")
-                 next_action = display_voltage_current # Default fallback
+         if pressed_pin is not None:
+             print(f"Startup interrupted by {pressed_pin}.")
+             next_action = next_action_for(pressed_pin) # "QUIT" signals the main loop to exit
              startup_interrupted = True
              break
-         elif pressed_pin is not None:
-             print(f"Warning: Unhandled startup interrupt result: {pressed_pin}")
-
-         if startup_interrupted: break
          # End of loop for one media item
 
     # If sequence finished without interruption, default to voltage display
     if not startup_interrupted and next_action != "QUIT":
         print("Startup sequence finished. Defaulting to sensor display.")
-        next_action = display_voltage_current
+        next_action = DEFAULT_ACTION
 
     print("End of startup sequence function.")
 
 
 # --- Main Loop ---
-running = True
 next_action = None
-last_press_times = {pin: 0 for pin in BUTTON_PINS}
 
 try:
     # Initial Modbus connection attempt (non-blocking)
     check_modbus_connection()
+    # Readings are kept fresh in the background from here on
+    sensor_thread.start()
+    preopen_video_captures()
 
     # Run Startup Sequence - this sets the initial `next_action`
     run_startup_sequence()
 
-    while running:
-        loop_start_time = time.monotonic()
-
-        # --- Execute Pending Action ---
-        current_action = next_action
-        next_action = None # Clear pending action before execution
-
-        action_result = None
-        if current_action == "QUIT":
-            running = False
-        elif callable(current_action):
-            print(f"Executing action: {current_action.__name__}")
-            action_result = current_action() # Execute the function (e.g., display_voltage_current or display_media)
-        # --- Action Execution Complete ---
-
-
-        # --- Handle Action Result ---
-        # This logic decides the *next* state based on how the action ended
-        if action_result == "QUIT":
-            print("Action resulted in QUIT signal.")
-            running = False
-        elif action_result in BUTTON_PINS:
-            # The action (e.g., sensor display) was interrupted by a button.
-            # Queue the corresponding action for the *next* loop iteration.
-            pin = action_result
-            print(f"Action returned button {pin}. Queuing next action.")
-            if pin == BUTTON_VOLTAGE_DISPLAY:
-                next_action = display_voltage_current
-            elif pin in BUTTON_MEDIA_MAP:
-                media_index = BUTTON_MEDIA_MAP[pin]
-                if 0 <= media_index < len(media_files):
-                     media_path = os.path.join(MEDIA_FOLDER, media_files[media_index])
-                     # Use default argument in lambda to capture the current value of media_path
-                     next_action = lambda p=media_path: display_media(p)
-                else:
-                    print(f"Warning: Media index {media_index} out of range for result button {pin}. Defaulting.")
-                    next_action = display_voltage_current # Fallback
-            else:
-                 print(f"Warning: No action mapped for result button {pin}. Defaulting.")
-                 next_action = display_voltage_current # Fallback
-        elif action_result is not None:
-             print(f"Warning: Action returned unexpected value: {action_result}. Defaulting.")
-             next_action = display_voltage_current # Default state if something unexpected happened
-
-
-        # --- Check for Events and Button Presses (only if no action is pending) ---
-        if next_action is None and running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
-                    print("Main loop: Quit event detected.")
-                    running = False
-                    break # Exit event loop
-
-            if not running: break # Exit main loop
-
-            # Check buttons
-            now = time.monotonic()
-            for pin in BUTTON_PINS:
-                if GPIO.input(pin) == GPIO.HIGH:
-                    if (now - last_press_times[pin]) > DEBOUNCE_TIME:
-                        print(f"Main loop: Button {pin} pressed.")
-                        last_press_times[pin] = now
-
-                        # Set the action for the next loop iteration
-                        if pin == BUTTON_VOLTAGE_DISPLAY:
-                            next_action = display_voltage_current
-                        elif pin in BUTTON_MEDIA_MAP:
-                            media_index = BUTTON_MEDIA_MAP[pin]
-                            if 0 <= media_index < len(media_files):
-                                media_path = os.path.join(MEDIA_FOLDER, media_files[media_index])
-                                next_action = lambda p=media_path: display_media(p) # Capture path
-                            else:
-                                print(f"Warning: Media index {media_index} out of range for button {pin}.")
-                                next_action = display_voltage_current # Fallback
-                        else:
-                             print(f"Warning: No action defined for button {pin}")
-                             # Maybe default to sensor screen if an unassigned button is hit?
-                             # next_action = display_voltage_current
-                        break # Handle only one button press per cycle
-
-        # --- End Event/Button Check ---
-
-        # Main loop wait to prevent high CPU usage when idle
-        if running:
-             elapsed_ms = (time.monotonic() - loop_start_time) * 1000
-             wait_ms = max(1, MAIN_LOOP_WAIT_MS - int(elapsed_ms))
-             pygame.time.wait(wait_ms)
+    # `next_action` is the state: a (function, args) action to run, None to idle until input,
+    # or "QUIT". Every step yields a result ('QUIT', a button pin, or None) that picks the next state.
+    while next_action != "QUIT":
+        if next_action is None:
+            # Idle: one blocking wait covers both keys and buttons (presses arrive as BUTTON_EVENTs)
+            result = wait_for_input()
+        else:
+            func, args = next_action
+            print(f"Executing action: {func.__name__}")
+            result = func(*args) # Execute the function (e.g., display_voltage_current or display_media)
+        next_action = next_action_for(result)
 
     # --- End Main Loop ---
 
 except KeyboardInterrupt:
     print("\nStopping application via KeyboardInterrupt...")
-    running = False
 
 except Exception as e:
     print("\n--- An unexpected error occurred ---")
     print(f"Error: {e}")
     traceback.print_exc()
     print("------------------------------------")
-    running = False
 
 finally:
     # --- Cleanup ---
     print("\nPerforming cleanup...")
+    if sensor_thread.is_alive():
+        print("Stopping sensor polling...")
+        sensor_stop_event.set()
+        sensor_thread.join(timeout=2 * MODBUS_TIMEOUT + 1) # Let an in-flight read finish before closing the port
     if client and client.is_socket_open():
         print("Closing Modbus client connection...")
         client.close()
+    release_all_video_captures()
     print("Cleaning up GPIO...")
-    GPIO.cleanup()
+    for pin in BUTTON_PINS:
+        try:
+            GPIO.remove_event_detect(pin) # Stop edge callbacks before the pins are released
+        except RuntimeError:
+            pass # Detection was never added for this pin
+    GPIO.cleanup(list(BUTTON_PINS)) # Only reset the pins this app set up
     print("Quitting Pygame...")
     pygame.quit()
     print("Application exited.")